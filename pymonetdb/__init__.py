@@ -10,42 +10,91 @@ To set up a connection use pymonetdb.connect()
 #
 # Copyright 1997 - July 2008 CWI, August 2008 - 2016 MonetDB B.V.
 
-import pkg_resources
+import importlib
+import sys
 from pymonetdb import sql
 from pymonetdb import mapi
 from pymonetdb import exceptions
 from pymonetdb import profiler
 
 from pymonetdb.profiler import ProfilerConnection
-from pymonetdb.sql.connections import Connection
+from pymonetdb.sql.connections import Connection, _LazyConnection
 from pymonetdb.sql.pythonize import *
 from pymonetdb.exceptions import *
 
-try:
-    __version__ = pkg_resources.require("pymonetdb")[0].version
-except pkg_resources.DistributionNotFound:
-    __version__ = "1.0rc"
-
 apilevel = "2.0"
 threadsafety = 1
 paramstyle = "pyformat"
 
-__all__ = ['sql', 'mapi', 'exceptions', 'BINARY', 'Binary', 'connect', 'Connection', 'DATE', 'Date', 'Time',
+__all__ = ('sql', 'mapi', 'exceptions', 'BINARY', 'Binary', 'connect', 'Connection', 'DATE', 'Date', 'Time',
            'Timestamp', 'DateFromTicks', 'TimeFromTicks', 'TimestampFromTicks', 'DataError', 'DatabaseError', 'Error',
            'IntegrityError', 'InterfaceError', 'InternalError', 'NUMBER', 'NotSupportedError', 'OperationalError',
-           'ProgrammingError', 'ROWID', 'STRING', 'TIME', 'Warning', 'apilevel', 'connect', 'paramstyle',
-           'threadsafety']
+           'ProgrammingError', 'ROWID', 'STRING', 'TIME', 'Warning', 'apilevel', 'paramstyle',
+           'threadsafety', 'ConnectionPool', 'close_all_pools')
+
+
+def connect(*args, pool=None, defer=False, **kwargs):
+    """ Set up a connection to a MonetDB SQL database.
 
+    Takes the arguments of pymonetdb.sql.connections.Connection, and:
 
-def connect(*args, **kwargs):
+    args:
+        pool (bool or ConnectionPool): take the connection from a pool,
+                                       True means the default pool
+        defer (bool): postpone connecting until the connection is first used
+                      (default: False)
+
+    returns:
+        Connection object
+    """
+    if pool is True:
+        from pymonetdb.pool import default_pool
+        pool = default_pool
+    if pool:
+        if defer:
+            raise ValueError("defer is not supported for pooled connections")
+        return pool.connect(*args, **kwargs)
+    if defer:
+        return _LazyConnection(*args, **kwargs)
     return Connection(*args, **kwargs)
 
 
 def profiler_connection(*args, **kwargs):
-    c = ProfilerConnection()
-    c.connect(*args, **kwargs)
-    return c
+    """ Set up a connection to the MonetDB profiler, see ProfilerConnection.connect() """
+    return ProfilerConnection(*args, **kwargs)
+
+
+# These are rarely needed, so they are only imported on first access (PEP 562).
+# Importing pkg_resources to look up the version is by far the most expensive
+# part of importing pymonetdb.
+_lazy = {
+    'ConnectionPool': ('pymonetdb.pool', 'ConnectionPool'),
+    'close_all_pools': ('pymonetdb.pool', 'close_all_pools'),
+}
+
+
+def _get_version():
+    import pkg_resources
+    try:
+        return pkg_resources.require("pymonetdb")[0].version
+    except pkg_resources.DistributionNotFound:
+        return "1.0rc"
+
+
+def __getattr__(name):
+    if name == '__version__':
+        value = _get_version()
+    elif name in _lazy:
+        module, attr = _lazy[name]
+        value = getattr(importlib.import_module(module), attr)
+    else:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    globals()[name] = value
+    return value
 
 
-connect.__doc__ = Connection.__init__.__doc__
-profiler_connection.__doc__ = ProfilerConnection.__init__.__doc__
+# Python 3.6 does not support module __getattr__, look everything up right away
+if sys.version_info < (3, 7):
+    for _name in ('__version__',) + tuple(_lazy):
+        __getattr__(_name)
+    del _name
@@ -13,8 +13,8 @@ import logging
 import struct
 import hashlib
 import os
-from typing import Optional
-from io import BytesIO
+import time
+from typing import Optional, Dict, Tuple, List
 
 from pymonetdb.exceptions import OperationalError, DatabaseError, \
     ProgrammingError, NotSupportedError, IntegrityError
@@ -23,6 +23,18 @@ logger = logging.getLogger(__name__)
 
 MAX_PACKAGE_LENGTH = (1024 * 8) - 2
 
+# block header: little endian short holding (length << 1) + last
+HEADER = struct.Struct('<H')
+
+# Received blocks are assembled in a buffer of this size that is kept with the
+# connection. It grows as needed, but is not kept once it exceeds the maximum.
+BUFFER_SIZE = 64 * 1024
+MAX_KEPT_BUFFER_SIZE = 1024 * 1024
+
+# All reads ask the socket for this many bytes and keep whatever arrives beyond
+# what was needed for the next read. The buffer is allocated on first use.
+RECV_BUFFER_SIZE = 64 * 1024
+
 MSG_PROMPT = ""
 MSG_MORE = "\1\2\n"
 MSG_INFO = "#"
@@ -40,9 +52,43 @@ MSG_TUPLE_NOSLICE = "="
 MSG_REDIRECT = "^"
 MSG_OK = "=OK"
 
+# first characters of responses that cmd() returns as they are
+_result_prefixes = frozenset((MSG_Q, MSG_HEADER, MSG_TUPLE))
+
 STATE_INIT = 0
 STATE_READY = 1
 
+# Address lookups are reused for this many seconds, instead of resolving the
+# host on every connect. Set PYMONETDB_DNS_CACHE_TTL to 0 to disable this.
+DEFAULT_DNS_CACHE_TTL = 30.0
+
+
+def _dns_cache_ttl_from_env():
+    value = os.environ.get('PYMONETDB_DNS_CACHE_TTL')
+    if value is None:
+        return DEFAULT_DNS_CACHE_TTL
+    try:
+        return float(value)
+    except ValueError:
+        # a typo in the environment should not make importing fail
+        logger.warning("ignoring invalid PYMONETDB_DNS_CACHE_TTL %r, using %s" % (value, DEFAULT_DNS_CACHE_TTL))
+        return DEFAULT_DNS_CACHE_TTL
+
+
+dns_cache_ttl = _dns_cache_ttl_from_env()
+_dns_cache = {}  # type: Dict[Tuple[str, int], Tuple[float, List]]
+
+# The named constructors are faster than looking algorithms up by name with
+# hashlib.new(), which remains the fallback for anything else.
+_hash_constructors = {
+    'sha512': hashlib.sha512,
+    'sha384': hashlib.sha384,
+    'sha256': hashlib.sha256,
+    'sha224': hashlib.sha224,
+    'sha1': hashlib.sha1,
+    'md5': hashlib.md5,
+}
+
 # MonetDB error codes
 errors = {
     '42S02': OperationalError,  # no such table
@@ -74,12 +120,32 @@ def handle_error(error):
         return OperationalError, error
 
 
+def resolve(hostname, port):
+    """Look up the addresses to try for hostname and port.
+
+    Results are cached for dns_cache_ttl seconds, if that is positive.
+    """
+    if dns_cache_ttl <= 0:
+        return socket.getaddrinfo(hostname, port, socket.AF_UNSPEC, socket.SOCK_STREAM)
+    now = time.monotonic()
+    cached = _dns_cache.get((hostname, port))
+    if cached and cached[0] > now:
+        return cached[1]
+    addresses = socket.getaddrinfo(hostname, port, socket.AF_UNSPEC, socket.SOCK_STREAM)
+    _dns_cache[(hostname, port)] = (now + dns_cache_ttl, addresses)
+    return addresses
+
+
 # noinspection PyExceptionInherit
 class Connection(object):
     """
     MAPI (low level MonetDB API) connection
     """
 
+    __slots__ = ('state', '_result', 'socket', 'unix_socket', 'hostname', 'port', 'username', 'password',
+                 'database', 'language', 'connect_timeout', '_buffer',
+                 '_recv_view', '_recv_start', '_recv_end')
+
     def __init__(self):
         self.state = STATE_INIT
         self._result = None
@@ -92,6 +158,10 @@ class Connection(object):
         self.database = ""
         self.language = ""
         self.connect_timeout = socket.getdefaulttimeout()
+        self._buffer: Optional[bytearray] = None
+        self._recv_view: Optional[memoryview] = None
+        self._recv_start = 0
+        self._recv_end = 0
 
     def connect(self, database, username, password, language, hostname=None,
                 port=None, unix_socket=None, connect_timeout=-1):
@@ -103,10 +173,13 @@ class Connection(object):
         if hostname and hostname[:1] == '/' and not unix_socket:
             unix_socket = '%s/.s.monetdb.%d' % (hostname, port)
             hostname = None
-        if not unix_socket and os.path.exists("/tmp/.s.monetdb.%i" % port):
+        # Only probe the file system for the default socket when it could
+        # actually be used, i.e. when no hostname was given.
+        if not unix_socket and not hostname:
             unix_socket = "/tmp/.s.monetdb.%i" % port
-        elif not unix_socket and not hostname:
-            hostname = 'localhost'
+            if not os.path.exists(unix_socket):
+                unix_socket = None
+                hostname = 'localhost'
 
         # None and zero are allowed values
         if connect_timeout != -1:
@@ -121,12 +194,14 @@ class Connection(object):
         self.language = language
         self.unix_socket = unix_socket
 
+        # anything received ahead on an earlier socket is meaningless now
+        self._recv_start = self._recv_end = 0
+
         if hostname:
             if self.socket:
                 self.socket.close()
                 self.socket = None
-            for af, socktype, proto, canonname, sa in socket.getaddrinfo(hostname, port,
-                                                                         socket.AF_UNSPEC, socket.SOCK_STREAM):
+            for af, socktype, proto, canonname, sa in resolve(hostname, port):
                 try:
                     self.socket = socket.socket(af, socktype, proto)
                     # For performance, mirror MonetDB/src/common/stream.c socket settings.
@@ -146,6 +221,8 @@ class Connection(object):
                     continue
                 break
             if self.socket is None:
+                # the addresses may be stale, look them up again next time
+                _dns_cache.pop((hostname, port), None)
                 raise socket.error("Connection refused")
         else:
             self.socket = socket.socket(socket.AF_UNIX)
@@ -220,7 +297,7 @@ class Connection(object):
 
     def cmd(self, operation):
         """ put a mapi command on the line"""
-        logger.debug("executing command %s" % operation)
+        logger.debug("executing command %s", operation)
 
         if self.state != STATE_READY:
             raise (ProgrammingError, "Not connected")
@@ -238,22 +315,25 @@ class Connection(object):
         # If we are performing an update test for errors such as a failed
         # transaction.
 
-        # We are splitting the response into lines and checking each one if it
-        # starts with MSG_ERROR. If this is the case, find which line records
-        # the error and use it to call handle_error.
+        # We are looking for the first line that starts with MSG_ERROR. If
+        # there is one, use it to call handle_error. The first line starts
+        # with MSG_QUPDATE so it never needs checking.
         if response[:2] == MSG_QUPDATE:
-            lines = response.split('\n')
-            if any([line.startswith(MSG_ERROR) for line in lines]):
-                index = next(i for i, v in enumerate(lines) if v.startswith(MSG_ERROR))
-                exception, msg = handle_error(lines[index][1:])
+            start = response.find('\n' + MSG_ERROR)
+            if start >= 0:
+                end = response.find('\n', start + 1)
+                if end < 0:
+                    end = len(response)
+                exception, msg = handle_error(response[start + 2:end])
                 raise exception(msg)
 
-        if response[0] in [MSG_Q, MSG_HEADER, MSG_TUPLE]:
+        first = response[0]
+        if first in _result_prefixes:
             return response
-        elif response[0] == MSG_ERROR:
+        elif first == MSG_ERROR:
             exception, msg = handle_error(response[1:])
             raise exception(msg)
-        elif response[0] == MSG_INFO:
+        elif first == MSG_INFO:
             logger.info("%s" % (response[1:]))
         elif self.language == 'control' and not self.hostname:
             if response.startswith("OK"):
@@ -272,9 +352,8 @@ class Connection(object):
         if protocol == '9':
             algo = challenges[5]
             try:
-                h = hashlib.new(algo)
-                h.update(password.encode())
-                password = h.hexdigest()
+                constructor = _hash_constructors.get(algo.lower()) or (lambda data: hashlib.new(algo, data))
+                password_hash = constructor(password.encode()).hexdigest().encode()
             except ValueError as e:
                 raise NotSupportedError(str(e))
         else:
@@ -282,15 +361,9 @@ class Connection(object):
 
         h = hashes.split(",")
         if "SHA1" in h:
-            s = hashlib.sha1()
-            s.update(password.encode())
-            s.update(salt.encode())
-            pwhash = "{SHA1}" + s.hexdigest()
+            pwhash = "{SHA1}" + hashlib.sha1(password_hash + salt.encode()).hexdigest()
         elif "MD5" in h:
-            m = hashlib.md5()
-            m.update(password.encode())
-            m.update(salt.encode())
-            pwhash = "{MD5}" + m.hexdigest()
+            pwhash = "{MD5}" + hashlib.md5(password_hash + salt.encode()).hexdigest()
         else:
             raise NotSupportedError("Unsupported hash algorithms required"
                                     " for login: %s" % hashes)
@@ -306,58 +379,110 @@ class Connection(object):
             return self._getblock_inet()
 
     def _getblock_inet(self):
-        result = BytesIO()
+        # Fast path: most responses are a single final chunk that arrives in
+        # one recv, decode those straight from the receive buffer.
+        recv_view = self._get_recv_view()
+        if self._recv_start == self._recv_end:
+            received = self.socket.recv_into(recv_view)
+            if received == 0:
+                raise BrokenPipeError("Server closed connection")
+            self._recv_start = 0
+            self._recv_end = received
+        start = self._recv_start
+        if self._recv_end - start >= 2:
+            unpacked = HEADER.unpack_from(recv_view, start)[0]
+            end = start + 2 + (unpacked >> 1)
+            if unpacked & 1 and end <= self._recv_end:
+                self._recv_start = end
+                return str(recv_view[start + 2:end], 'utf-8')
+
+        buffer = self._buffer
+        if buffer is None:
+            buffer = bytearray(BUFFER_SIZE)
+        end = 0
         last = 0
         while not last:
-            flag = self._getbytes(2)
-            unpacked = struct.unpack('<H', flag)[0]  # little endian short
+            # the header is read at the end of the data so far and then
+            # overwritten by the data it announces
+            self._getbytes(buffer, end, 2)
+            unpacked = HEADER.unpack_from(buffer, end)[0]
             length = unpacked >> 1
             last = unpacked & 1
-            result.write(self._getbytes(length))
-        return result.getvalue().decode()
+            self._getbytes(buffer, end, length)
+            end += length
+        with memoryview(buffer) as view, view[:end] as data:
+            result = str(data, 'utf-8')
+        self._buffer = buffer if len(buffer) <= MAX_KEPT_BUFFER_SIZE else None
+        return result
 
     def _getblock_socket(self):
-        buffer = BytesIO()
+        # the server closes the socket after its response, read until then
+        buffer = bytearray()
+        recv_view = self._get_recv_view()
         while True:
-            x = self.socket.recv(1)
-            if len(x):
-                buffer.write(x)
-            else:
+            received = self.socket.recv_into(recv_view)
+            if not received:
                 break
-        return buffer.getvalue().strip().decode()
-
-    def _getbytes(self, bytes_):
-        """Read an amount of bytes from the socket"""
-        result = BytesIO()
-        count = bytes_
-        while count > 0:
-            recv = self.socket.recv(count)
-            if len(recv) == 0:
-                raise BrokenPipeError("Server closed connection")
-            count -= len(recv)
-            result.write(recv)
-        return result.getvalue()
+            buffer += recv_view[:received]
+        return buffer.strip().decode()
+
+    def _getbytes(self, buffer, offset, count):
+        """Read exactly count bytes from the socket into buffer at offset"""
+        end = offset + count
+        if len(buffer) < end:
+            # grow geometrically so large responses need few reallocations
+            buffer += bytes(max(end, 2 * len(buffer)) - len(buffer))
+        recv_view = self._get_recv_view()
+        with memoryview(buffer) as view:
+            # first use up what was received ahead by an earlier call
+            available = min(self._recv_end - self._recv_start, count)
+            if available:
+                view[offset:offset + available] = recv_view[self._recv_start:self._recv_start + available]
+                self._recv_start += available
+                offset += available
+            while offset < end:
+                received = self.socket.recv_into(recv_view)
+                if received == 0:
+                    raise BrokenPipeError("Server closed connection")
+                used = min(received, end - offset)
+                view[offset:offset + used] = recv_view[:used]
+                self._recv_start = used
+                self._recv_end = received
+                offset += used
+
+    def _get_recv_view(self):
+        """Return the receive buffer, allocating it on first use"""
+        if self._recv_view is None:
+            self._recv_view = memoryview(bytearray(RECV_BUFFER_SIZE))
+        return self._recv_view
 
     def _putblock(self, block):
         """ wrap the line in mapi format and put it into the socket """
+        data = block.encode()
         if self.language == 'control' and not self.hostname:
-            return self.socket.send(block.encode())  # control doesn't do block splitting when using a socket
+            self.socket.sendall(data)  # control doesn't do block splitting when using a socket
         else:
-            self._putblock_inet(block)
+            self._putblock_inet(data)
 
     def _putblock_inet(self, block):
-        pos = 0
-        last = 0
-        block = block.encode()
-        while not last:
-            data = block[pos:pos + MAX_PACKAGE_LENGTH]
+        if len(block) < MAX_PACKAGE_LENGTH:
+            # most commands fit in a single, final chunk
+            self.socket.sendall(HEADER.pack((len(block) << 1) + 1) + block)
+            return
+        # Frame the whole message first so it goes out in a single sendall.
+        # The last chunk is the first one shorter than MAX_PACKAGE_LENGTH,
+        # which may be empty.
+        view = memoryview(block)
+        buffer = bytearray(len(block) + 2 * (len(block) // MAX_PACKAGE_LENGTH + 1))
+        offset = 0
+        for pos in range(0, len(block) + 1, MAX_PACKAGE_LENGTH):
+            data = view[pos:pos + MAX_PACKAGE_LENGTH]
             length = len(data)
-            if length < MAX_PACKAGE_LENGTH:
-                last = 1
-            flag = struct.pack('<H', (length << 1) + last)
-            self.socket.send(flag)
-            self.socket.send(data)
-            pos += length
+            last = 1 if length < MAX_PACKAGE_LENGTH else 0
+            HEADER.pack_into(buffer, offset, (length << 1) + last)
+            buffer[offset + 2:offset + 2 + length] = data
+            offset += 2 + length
+        self.socket.sendall(buffer)
 
     def __del__(self):
         if self.socket:
@@ -0,0 +1,200 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0.  If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright 1997 - July 2008 CWI, August 2008 - 2016 MonetDB B.V.
+"""
+A pool of reusable SQL connections.
+
+Setting up a connection costs a TCP handshake, a login round trip and a few
+session commands. Applications that open many short-lived connections can
+avoid that by passing ``pool=True`` to :func:`pymonetdb.connect`, or by
+creating their own :class:`ConnectionPool`.
+"""
+
+import inspect
+import logging
+import threading
+import time
+import weakref
+
+from pymonetdb import exceptions
+from pymonetdb.sql import cursors
+from pymonetdb.sql.connections import Connection
+
+logger = logging.getLogger(__name__)
+
+_pools = weakref.WeakSet()  # type: weakref.WeakSet
+
+# Looked up once, so the pool follows Connection() without keeping a copy of
+# its argument list.
+_connect_signature = inspect.signature(Connection)
+
+
+class ConnectionPool(object):
+    """
+    Keeps idle connections around so they can be handed out again.
+
+    Connections are pooled per set of connect arguments. Closing a connection
+    obtained from the pool rolls back any pending transaction, restores
+    autocommit, the reply size, the size header, the current schema and the
+    time zone, and returns it to the pool. Other session state, such as
+    prepared statements and temporary tables, is not reset.
+    """
+
+    def __init__(self, max_size=10, max_idle_seconds=300):
+        """
+        args:
+            max_size (int): maximum number of idle connections kept per set
+                            of connect arguments (default: 10)
+            max_idle_seconds (float): idle connections older than this are
+                                      closed the next time the pool is used
+                                      (default: 300)
+        """
+        self.max_size = max_size
+        self.max_idle_seconds = max_idle_seconds
+        self._lock = threading.Lock()
+        self._idle = {}
+        _pools.add(self)
+
+    def connect(self, *args, **kwargs):
+        """ Return a pooled connection, takes the same arguments as pymonetdb.connect() """
+        # Binding raises TypeError for unknown arguments, and makes calls
+        # that differ only in how arguments are passed share a pool.
+        bound = _connect_signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(bound.arguments.values())
+        with self._lock:
+            expired = self._take_expired()
+            idle = self._idle.get(key)
+            entry = idle.pop() if idle else None
+        for conn in expired:
+            _close_quietly(conn)
+        if entry:
+            _, conn, settings = entry
+        else:
+            conn = Connection(*args, **kwargs)
+            try:
+                settings = (conn.autocommit, conn.replysize, conn.sizeheader) + _session_state(conn)
+            except Exception:
+                _close_quietly(conn)
+                raise
+        return PooledConnection(self, key, conn, settings)
+
+    def close(self):
+        """ Close all idle connections held by this pool """
+        with self._lock:
+            entries = [entry for idle in self._idle.values() for entry in idle]
+            self._idle.clear()
+        for _, conn, _ in entries:
+            _close_quietly(conn)
+
+    def _take_expired(self):
+        """ Remove and return idle connections past max_idle_seconds, call with the lock held """
+        deadline = time.monotonic() - self.max_idle_seconds
+        expired = []
+        for key in list(self._idle):
+            idle = self._idle[key]
+            # oldest first, connections are handed out from the end
+            while idle and idle[0][0] < deadline:
+                expired.append(idle.pop(0)[1])
+            if not idle:
+                del self._idle[key]
+        return expired
+
+    def _release(self, key, conn, settings):
+        autocommit, replysize, sizeheader, schema, timezone = settings
+        try:
+            if not conn.autocommit:
+                conn.rollback()
+            if conn.autocommit != autocommit:
+                conn.set_autocommit(autocommit)
+            if conn.replysize != replysize:
+                conn.set_replysize(replysize)
+            if conn.sizeheader != sizeheader:
+                conn.set_sizeheader(sizeheader)
+            if _session_state(conn) != (schema, timezone):
+                cursor = conn.cursor()
+                cursor.execute('SET SCHEMA "%s"' % schema.replace('"', '""'))
+                cursor.execute('SET TIME ZONE %s', (timezone,))
+            if not conn.autocommit:
+                # don't keep the transaction the queries above started open
+                conn.rollback()
+        except (exceptions.Error, OSError) as e:
+            logger.info("discarding pooled connection: %s" % e)
+            _close_quietly(conn)
+            return
+        with self._lock:
+            expired = self._take_expired()
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_size:
+                idle.append((time.monotonic(), conn, settings))
+            else:
+                expired.append(conn)
+        for conn in expired:
+            _close_quietly(conn)
+
+
+class PooledConnection(object):
+    """
+    Wraps a Connection handed out by a ConnectionPool. Everything is forwarded
+    to the wrapped connection, except close() which returns it to the pool.
+    """
+
+    def __init__(self, pool, key, conn, settings):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._settings = settings
+
+    def __getattr__(self, name):
+        return getattr(self._checked(), name)
+
+    def _checked(self):
+        if self._conn is None:
+            raise exceptions.Error("connection closed")
+        return self._conn
+
+    def cursor(self):
+        """ Return a new Cursor that goes through this pooled connection """
+        # A cursor keeps a reference to its connection, so it must not get
+        # the wrapped one or it would keep working after close().
+        return cursors.Cursor(self)
+
+    def execute(self, query):
+        """ use this for executing SQL queries """
+        return self._checked().execute(query)
+
+    def command(self, command):
+        """ use this function to send low level mapi commands """
+        return self._checked().command(command)
+
+    def close(self):
+        """ Return the connection to the pool it came from """
+        if self._conn is None:
+            raise exceptions.Error("already closed")
+        conn, self._conn = self._conn, None
+        self._pool._release(self._key, conn, self._settings)
+
+
+def _session_state(conn):
+    """ Return the current schema and time zone of conn """
+    cursor = conn.cursor()
+    cursor.execute('SELECT CURRENT_SCHEMA, CURRENT_TIMEZONE')
+    return tuple(cursor.fetchone())
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception as e:
+        logger.debug("error closing pooled connection: %s" % e)
+
+
+default_pool = ConnectionPool()
+
+
+def close_all_pools():
+    """ Close the idle connections of every ConnectionPool """
+    for pool in list(_pools):
+        pool.close()
@@ -16,11 +16,15 @@ class ProfilerConnection(object):
     A connection to the MonetDB profiler.
     """
 
-    def __init__(self):
+    def __init__(self, *args, **kwargs):
+        """ Any arguments are passed on to connect(). Without arguments the
+        connection is not set up until connect() is called. """
         self._mapi = mapi.Connection()
         self._heartbeat = 0
         self._buffer = ""
         self._objects = list()
+        if args or kwargs:
+            self.connect(*args, **kwargs)
 
     def connect(self, database, username="monetdb", password="monetdb", hostname=None, port=50000, heartbeat=0):
         self._heartbeat = heartbeat
@@ -34,8 +38,15 @@ class ProfilerConnection(object):
             self._mapi.cmd("profiler.openstream(3);\n")
 
     def read_object(self):
-        self._buffer = self._mapi._getblock()
-        while not self._buffer.endswith("}\n"):
-            self._buffer += self._mapi._getblock()
+        # Collect the blocks and join them once, rather than growing a string
+        # block by block. Only the last two characters are needed to see
+        # whether the object is complete.
+        parts = []
+        tail = ""
+        while tail != "}\n":
+            block = self._mapi._getblock()
+            parts.append(block)
+            tail = (tail + block)[-2:]
+        self._buffer = "".join(parts)
 
         return self._buffer[:-1]
@@ -40,15 +40,9 @@ class Connection(object):
 
         """
 
-        self.autocommit = autocommit
-        self.sizeheader = True
-        self.replysize = 0
-
         # The DB API spec is not specific about this
-        if host:
-            hostname = host
-        if user:
-            username = user
+        hostname = host or hostname
+        username = user or username
 
         if platform.system() == "Windows" and not hostname:
             hostname = "localhost"
@@ -169,3 +163,45 @@ class Connection(object):
     InternalError = exceptions.InternalError
     ProgrammingError = exceptions.ProgrammingError
     NotSupportedError = exceptions.NotSupportedError
+
+
+class _LazyConnection(Connection):
+    """A Connection that only connects to the server when it is first used"""
+
+    def __init__(self, *args, **kwargs):
+        """ Takes the same arguments as Connection but does not connect yet """
+        self._connect_args = (args, kwargs)
+        self._opened = False
+
+    def __getattr__(self, name):
+        # Only called for attributes that have not been set. Until the
+        # connection is opened that includes everything Connection.__init__
+        # sets up, so any public attribute opens it.
+        if not name.startswith('_') and not self._opened:
+            if not self._connect_args:
+                raise exceptions.Error("connection closed")
+            self._open()
+            return getattr(self, name)
+        raise AttributeError("%r object has no attribute %r" % (type(self).__name__, name))
+
+    def _open(self):
+        args, kwargs = self._connect_args
+        # cleared while connecting, so attributes read by Connection.__init__
+        # before setting them cannot recurse into another connect
+        self._connect_args = None
+        try:
+            Connection.__init__(self, *args, **kwargs)
+        except Exception:
+            # allow a later attempt to connect again
+            self.__dict__.pop('mapi', None)
+            self._connect_args = (args, kwargs)
+            raise
+        self._opened = True
+
+    def close(self):
+        if self._connect_args:
+            # never connected, nothing to roll back
+            self._connect_args = None
+            self.mapi = None
+        else:
+            Connection.close(self)
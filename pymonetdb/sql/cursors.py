@@ -7,7 +7,6 @@
 import logging
 from collections import namedtuple
 from typing import Optional, Dict
-from pymonetdb.sql.debug import debug, export
 from pymonetdb.sql import monetize, pythonize
 from pymonetdb.exceptions import ProgrammingError, InterfaceError
 from pymonetdb import mapi
@@ -183,9 +182,12 @@ class Cursor(object):
             using the PDB debugger. Optionally can run on only a
             sample of the input data, for faster data export.
         """
+        # imported here because pdb and friends are expensive to import
+        from pymonetdb.sql.debug import debug
         debug(self, query, fname, sample)
 
     def export(self, query, fname, sample=-1, filespath='./'):
+        from pymonetdb.sql.debug import export
         return export(self, query, fname, sample, filespath)
 
     def fetchone(self):
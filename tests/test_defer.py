@@ -0,0 +1,41 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0.  If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright 1997 - July 2008 CWI, August 2008 - 2016 MonetDB B.V.
+
+import unittest
+import pymonetdb
+from tests.util import test_args
+
+
+class TestDefer(unittest.TestCase):
+    def test_connects_on_first_use(self):
+        con = pymonetdb.connect(defer=True, **test_args)
+        self.assertNotIn('mapi', con.__dict__)
+        cursor = con.cursor()
+        self.assertIn('mapi', con.__dict__)
+        cursor.execute('select 1')
+        self.assertEqual(cursor.fetchone(), (1,))
+        con.close()
+
+    def test_attribute_connects(self):
+        con = pymonetdb.connect(defer=True, autocommit=True, **test_args)
+        self.assertTrue(con.autocommit)
+        self.assertIn('mapi', con.__dict__)
+        con.close()
+
+    def test_close_without_use(self):
+        con = pymonetdb.connect(defer=True, **test_args)
+        con.close()
+        with self.assertRaises(pymonetdb.Error):
+            con.cursor()
+        self.assertRaises(pymonetdb.Error, con.close)
+
+    def test_connect_error_on_first_use(self):
+        args = dict(test_args, port=1)
+        con = pymonetdb.connect(defer=True, **args)
+        self.assertRaises(OSError, con.cursor)
+
+    def test_not_with_pool(self):
+        self.assertRaises(ValueError, pymonetdb.connect, pool=True, defer=True, **test_args)
@@ -1,5 +1,10 @@
+import hashlib
+import socket
+import threading
 from unittest import TestCase
+from unittest.mock import patch
 from tests.util import test_args
+from pymonetdb import mapi
 from pymonetdb.mapi import Connection
 
 
@@ -16,3 +21,161 @@ class TestMapi(TestCase):
             data = self.conn.cmd(query)
             cleaned = [i for i in data.split('\n') if i and not i[0] in '%&']
             self.assertEqual(len(cleaned), size)
+
+
+class TestResolve(TestCase):
+    def setUp(self):
+        mapi._dns_cache.clear()
+
+    @patch('pymonetdb.mapi.dns_cache_ttl', 0)
+    @patch('socket.getaddrinfo', return_value=[])
+    def test_uncached(self, mock_getaddrinfo):
+        mapi.resolve('example.com', 50000)
+        mapi.resolve('example.com', 50000)
+        self.assertEqual(mock_getaddrinfo.call_count, 2)
+
+    @patch('pymonetdb.mapi.dns_cache_ttl', 30)
+    @patch('socket.getaddrinfo', return_value=[])
+    def test_cached(self, mock_getaddrinfo):
+        mapi.resolve('example.com', 50000)
+        mapi.resolve('example.com', 50000)
+        mapi.resolve('example.com', 50001)
+        self.assertEqual(mock_getaddrinfo.call_count, 2)
+
+    @patch('pymonetdb.mapi.dns_cache_ttl', 30)
+    @patch('socket.getaddrinfo', return_value=[(socket.AF_INET, socket.SOCK_STREAM, 0, '', ('127.0.0.1', 1))])
+    def test_dropped_after_failure(self, mock_getaddrinfo):
+        conn = Connection()
+        self.assertRaises(OSError, conn.connect, database='demo', username='monetdb', password='monetdb',
+                          language='sql', hostname='example.com', port=1)
+        self.assertEqual(mapi._dns_cache, {})
+
+    def test_ttl_from_env(self):
+        with patch.dict('os.environ', {'PYMONETDB_DNS_CACHE_TTL': '0'}):
+            self.assertEqual(mapi._dns_cache_ttl_from_env(), 0)
+        with patch.dict('os.environ', {'PYMONETDB_DNS_CACHE_TTL': 'off'}):
+            self.assertEqual(mapi._dns_cache_ttl_from_env(), mapi.DEFAULT_DNS_CACHE_TTL)
+
+
+class FakeSocket(object):
+    def __init__(self, incoming=b'', recv_size=1000):
+        self.sent = bytearray()
+        self.incoming = incoming
+        self.recv_size = recv_size
+
+    def sendall(self, data):
+        self.sent += data
+
+    def recv_into(self, buffer):
+        n = min(len(buffer), self.recv_size, len(self.incoming))
+        buffer[:n] = self.incoming[:n]
+        self.incoming = self.incoming[n:]
+        return n
+
+    def close(self):
+        pass
+
+
+class TestPutblock(TestCase):
+    def setUp(self):
+        self.conn = Connection()
+        self.conn.hostname = 'localhost'
+        self.conn.socket = FakeSocket()
+
+    def test_empty(self):
+        self.conn._putblock('')
+        self.assertEqual(self.conn.socket.sent, b'\x01\x00')
+
+    def test_small(self):
+        self.conn._putblock('sselect 1;')
+        self.assertEqual(self.conn.socket.sent, b'\x15\x00sselect 1;')
+
+    def test_chunked(self):
+        size = mapi.MAX_PACKAGE_LENGTH
+        for length in (size, size + 1, 3 * size + 7):
+            self.conn.socket = FakeSocket()
+            self.conn._putblock('a' * length)
+            sent = self.conn.socket.sent
+            chunks = length // size + 1
+            self.assertEqual(len(sent), length + 2 * chunks)
+            for i in range(chunks - 1):
+                offset = i * (size + 2)
+                self.assertEqual(mapi.HEADER.unpack_from(sent, offset)[0], size << 1)
+            offset = (chunks - 1) * (size + 2)
+            self.assertEqual(mapi.HEADER.unpack_from(sent, offset)[0], ((length % size) << 1) + 1)
+
+
+def frame(data, size=mapi.MAX_PACKAGE_LENGTH):
+    """ Wrap data in MAPI blocks of at most size bytes """
+    out = b''
+    for pos in range(0, len(data) + 1, size):
+        chunk = data[pos:pos + size]
+        out += mapi.HEADER.pack((len(chunk) << 1) + (len(chunk) < size)) + chunk
+    return out
+
+
+class TestGetblock(TestCase):
+    def setUp(self):
+        self.conn = Connection()
+        self.conn.hostname = 'localhost'
+
+    def test_blocks(self):
+        first = 'é' * mapi.BUFFER_SIZE
+        second = '&1 0 1 1 1\n'
+        self.conn.socket = FakeSocket(frame(first.encode()) + frame(second.encode(), 5))
+        self.assertEqual(self.conn._getblock(), first)
+        self.assertEqual(self.conn._getblock(), second)
+
+    def test_received_ahead(self):
+        # the long block spans several chunks and several receive buffers
+        blocks = ['first', 'second', '', 'x' * 3 * mapi.RECV_BUFFER_SIZE, 'last']
+        data = b''.join(frame(block.encode()) for block in blocks)
+        for recv_size in (1, 7, 1000, len(data)):
+            self.conn.socket = FakeSocket(data, recv_size)
+            for block in blocks:
+                self.assertEqual(self.conn._getblock(), block)
+
+    def test_receive_buffer_allocated_on_first_read(self):
+        self.assertIsNone(self.conn._recv_view)
+        self.conn.socket = FakeSocket(frame(b'abc'))
+        self.assertEqual(self.conn._getblock(), 'abc')
+        self.assertEqual(len(self.conn._recv_view), mapi.RECV_BUFFER_SIZE)
+
+    def test_server_closed(self):
+        self.conn.socket = FakeSocket(frame(b'abcdef')[:5])
+        self.assertRaises(BrokenPipeError, self.conn._getblock)
+
+
+class TestChallengeResponse(TestCase):
+    def test_response(self):
+        conn = Connection()
+        conn.username = 'monetdb'
+        conn.password = 'secret'
+        conn.language = 'sql'
+        conn.database = 'demo'
+        for algo in ('SHA512', 'SHA256', 'sha3_256'):
+            challenge = 'salty:merovingian:9:RIPEMD160,SHA256,SHA1,MD5:LIT:%s:' % algo
+            password = hashlib.new(algo, b'secret').hexdigest()
+            expected = hashlib.sha1((password + 'salty').encode()).hexdigest()
+            self.assertEqual(conn._challenge_response(challenge),
+                             'BIG:monetdb:{SHA1}%s:sql:demo:' % expected)
+
+
+class TestGetblockSocket(TestCase):
+    def test_read_until_closed(self):
+        conn = Connection()
+        conn.language = 'control'
+        conn.hostname = None
+        conn.socket, server = socket.socketpair()
+        response = '=OK\n' + 'x' * 3 * mapi.RECV_BUFFER_SIZE
+
+        def serve():
+            server.sendall(response.encode())
+            server.close()
+
+        sender = threading.Thread(target=serve)
+        sender.start()
+        self.assertEqual(conn._getblock(), response.strip())
+        sender.join()
+        conn.socket.close()
+        conn.socket = None
@@ -47,3 +47,16 @@ class MultilineResponseTest(unittest.TestCase):
 
         # Make sure that cmd raises the correct exception
         self.assertRaises(pymonetdb.IntegrityError, c.cmd, [query_text])
+
+    @patch('pymonetdb.mapi.Connection._putblock')
+    @patch('pymonetdb.mapi.Connection._getblock')
+    def test_error_on_later_line(self, mock_getblock, _):
+        """The error line does not have to follow the update line directly,
+           and does not have to end in a newline."""
+        mock_getblock.return_value = "&2 1 -1\n#some comment\n!42S02!no such table"
+        c = pymonetdb.mapi.Connection()
+        c.state = pymonetdb.mapi.STATE_READY
+
+        with self.assertRaises(pymonetdb.OperationalError) as cm:
+            c.cmd('sINSERT INTO tbl VALUES (1)')
+        self.assertEqual(str(cm.exception), '42S02!no such table')
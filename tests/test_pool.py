@@ -0,0 +1,116 @@
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0.  If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+#
+# Copyright 1997 - July 2008 CWI, August 2008 - 2016 MonetDB B.V.
+
+import unittest
+import pymonetdb
+from tests.util import test_args
+
+
+class TestPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = pymonetdb.ConnectionPool(max_size=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def test_reuse(self):
+        con = self.pool.connect(**test_args)
+        inner = con._conn
+        con.close()
+        con = self.pool.connect(**test_args)
+        self.assertIs(con._conn, inner)
+        con.close()
+
+    def test_concurrent_connections_differ(self):
+        con1 = self.pool.connect(**test_args)
+        con2 = self.pool.connect(**test_args)
+        self.assertIsNot(con1._conn, con2._conn)
+        con1.close()
+        con2.close()
+
+    def test_closed_connection_unusable(self):
+        con = self.pool.connect(**test_args)
+        con.close()
+        with self.assertRaises(pymonetdb.Error):
+            con.cursor()
+        self.assertRaises(pymonetdb.Error, con.close)
+
+    def test_rollback_on_close(self):
+        con = self.pool.connect(autocommit=False, **test_args)
+        con.cursor().execute('create table pooltest (i int)')
+        con.close()
+        con = self.pool.connect(autocommit=False, **test_args)
+        cursor = con.cursor()
+        self.assertRaises(pymonetdb.OperationalError, cursor.execute, 'select * from pooltest')
+        con.close()
+
+    def test_settings_restored_on_close(self):
+        con = self.pool.connect(autocommit=False, **test_args)
+        con.set_autocommit(True)
+        con.set_replysize(10)
+        con.set_sizeheader(False)
+        con.close()
+        con = self.pool.connect(autocommit=False, **test_args)
+        self.assertFalse(con.autocommit)
+        self.assertEqual(con.replysize, 100)
+        self.assertTrue(con.sizeheader)
+        con.close()
+
+    def test_session_state_restored_on_close(self):
+        con = self.pool.connect(**test_args)
+        cursor = con.cursor()
+        cursor.execute('SELECT CURRENT_SCHEMA, CURRENT_TIMEZONE')
+        initial = cursor.fetchone()
+        cursor.execute('SET SCHEMA tmp')
+        cursor.execute("SET TIME ZONE INTERVAL '+05:00' HOUR TO MINUTE")
+        con.close()
+        con = self.pool.connect(**test_args)
+        cursor = con.cursor()
+        cursor.execute('SELECT CURRENT_SCHEMA, CURRENT_TIMEZONE')
+        self.assertEqual(cursor.fetchone(), initial)
+        con.close()
+
+    def test_cursor_unusable_after_close(self):
+        con = self.pool.connect(**test_args)
+        cursor = con.cursor()
+        con.close()
+        self.assertRaises(pymonetdb.Error, cursor.execute, 'select 1')
+
+    def test_expired_connections_closed(self):
+        pool = pymonetdb.ConnectionPool(max_idle_seconds=0)
+        con = pool.connect(**test_args)
+        inner = con._conn
+        con.close()
+        # released under a different key, but still sweeps the first one
+        pool.connect(autocommit=True, **test_args).close()
+        self.assertIsNone(inner.mapi)
+        pool.close()
+
+    def test_default_pool(self):
+        con = pymonetdb.connect(pool=True, **test_args)
+        inner = con._conn
+        con.close()
+        con = pymonetdb.connect(pool=True, **test_args)
+        self.assertIs(con._conn, inner)
+        con.close()
+        pymonetdb.close_all_pools()
+        con = pymonetdb.connect(pool=True, **test_args)
+        self.assertIsNot(con._conn, inner)
+        con.close()
+
+    def test_unknown_argument(self):
+        self.assertRaises(TypeError, self.pool.connect, bogus=1, **test_args)
+        self.assertEqual(self.pool._idle, {})
+
+    def test_positional_and_keyword_share_pool(self):
+        args = dict(test_args)
+        database = args.pop('database')
+        con = self.pool.connect(database, **args)
+        inner = con._conn
+        con.close()
+        con = self.pool.connect(database=database, **args)
+        self.assertIs(con._conn, inner)
+        con.close()
@@ -22,3 +22,9 @@ class ProfilerTest(unittest.TestCase):
         response = '{"key":"value"}\n'  # A random JSON object
         mock_getblock.return_value = response
         self.assertEqual(self.conn.read_object(), response[:-1])
+
+    @patch('pymonetdb.mapi.Connection._getblock')
+    def test_object_split_over_blocks(self, mock_getblock):
+        blocks = ['{"key":', '"val}', 'ue"}', '\n']
+        mock_getblock.side_effect = blocks
+        self.assertEqual(self.conn.read_object(), '{"key":"val}ue"}')